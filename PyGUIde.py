@@ -1,30 +1,398 @@
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, simpledialog
+from tkinter import filedialog, messagebox, ttk, simpledialog, font as tkfont
 import subprocess
 import sys
 import os
 import ast
+import tokenize
+import bisect
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import queue
 import re
-from pathlib import Path
 import json
-from datetime import datetime
-import importlib.util
-import pkg_resources
-import venv
+import functools
+import io
+import codecs
+import locale
+import contextlib
+import time
+from collections import OrderedDict
 
 # Set the appearance mode and color theme
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# Keep child processes from opening a console window on Windows
+if os.name == 'nt':
+    _SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW
+    _STARTUPINFO = subprocess.STARTUPINFO()
+    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _STARTUPINFO.wShowWindow = subprocess.SW_HIDE
+else:
+    _SUBPROCESS_FLAGS = 0
+    _STARTUPINFO = None
+
+# Requirement strings that pin versions, extras or markers (need co-resolution)
+_REQUIREMENT_SPEC_RE = re.compile(r'[<>=!~;@\[\s]')
+
+# Special cases where import name differs from package name
+_IMPORT_TO_PACKAGE = {
+    'pil': 'pillow',
+    'yaml': 'pyyaml',
+    'cv2': 'opencv-python',
+    'skimage': 'scikit-image',
+    'sklearn': 'scikit-learn',
+    'bs4': 'beautifulsoup4',
+}
+
+# Characters handed to the editor per insert when loading a file
+_EDITOR_INSERT_CHUNK = 1 << 16
+
+# Files larger than this are decoded straight from a read-only mapping
+_MMAP_READ_THRESHOLD = 1 << 20
+
+# Pretty-printing encoder for the settings file, built once
+_SETTINGS_ENCODER = json.JSONEncoder(indent=2).encode
+
+# Tcl 8 stores characters outside the BMP as surrogate pairs, so each one
+# takes two columns in a Tk text index where Python counts one
+_TK_SURROGATE_PAIRS = tk.TclVersion < 9
+_ASTRAL_RE = re.compile('[\U00010000-\U0010ffff]')
+
+# Valid top-level module name (compiled once, used for every import checked)
+_IDENT_RE = re.compile(r'[a-zA-Z_]\w*\Z', re.ASCII)
+
+def _stdlib_module_names():
+    """Return the names of the top-level standard library modules"""
+    names = getattr(sys, 'stdlib_module_names', None)
+    if names is not None:
+        return frozenset(names)
+    
+    # Python < 3.10: list the standard library directories instead
+    import sysconfig
+    stdlib_dir = sysconfig.get_paths()['stdlib']
+    names = set(sys.builtin_module_names)
+    for directory in (stdlib_dir, os.path.join(stdlib_dir, 'lib-dynload')):
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            continue
+        for entry in entries:
+            # Covers packages, foo.py and extension modules like foo.cpython-39-x86_64.so
+            name = entry.split('.')[0]
+            if name != 'site-packages' and _IDENT_RE.match(name):
+                names.add(name)
+    return frozenset(names)
+
+_STDLIB_MODULES = _stdlib_module_names()
+
+def _read_file_bytes(file_path):
+    """Read a whole file as bytes, bypassing the buffered/text IO layers"""
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        size = os.fstat(fd).st_size
+        
+        # Normally a single read; keep going in case of short reads or growth
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 1 << 16))
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+def _walk_py(path, exclude_dirs):
+    """Yield the .py files below path, skipping directories named in exclude_dirs"""
+    # DirEntry caches the type from the directory listing, so no per-entry stat
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in exclude_dirs:
+                        yield from _walk_py(entry.path, exclude_dirs)
+                elif entry.name.endswith('.py'):
+                    yield entry.path
+    except OSError:
+        # Unreadable directories are skipped, as os.walk does
+        pass
+
+def _project_exclude_dirs(dependency_manager):
+    """Return the directory names skipped when scanning a project for python files"""
+    exclude_dirs = {'.git', '__pycache__', 'build', 'dist', '.vscode', 'venv', 'env', '.venv', '.env'}
+    if dependency_manager and dependency_manager.venv_path:
+        exclude_dirs.add(os.path.basename(dependency_manager.venv_path))
+    return exclude_dirs
+
+def _dir_key(path):
+    """Return path normalised for comparison, with a trailing separator"""
+    # The separator keeps "/foo" from matching as a prefix of "/foobar"
+    return os.path.join(os.path.normcase(os.path.normpath(path)), '')
+
+def _read_text_file(file_path):
+    """Read a UTF-8 text file with universal newlines, like open(file_path).read()"""
+    text = None
+    if os.path.getsize(file_path) > _MMAP_READ_THRESHOLD:
+        import mmap
+        try:
+            with open(file_path, 'rb') as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # Decoding from the mapping skips the intermediate bytes copy
+                text = str(mapped, 'utf-8')
+        except (OSError, ValueError):
+            # Not mappable (pipe, special file, shrunk meanwhile); read it normally
+            pass
+    if text is None:
+        text = _read_file_bytes(file_path).decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _stream_output(stream, output_callback, chunk_size=4096):
+    """Read a binary pipe in chunks and pass the decoded text to output_callback"""
+    # Decode incrementally so multi-byte characters and \r\n pairs split
+    # across chunk boundaries are handled like a text-mode pipe would
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors='replace'),
+        translate=True
+    )
+    for chunk in iter(lambda: stream.read1(chunk_size), b''):
+        text = decoder.decode(chunk)
+        if text:
+            output_callback(text)
+    
+    text = decoder.decode(b'', final=True)
+    if text:
+        output_callback(text)
+
+@functools.lru_cache(maxsize=4096)
+def _is_stdlib(module_name):
+    """
+    Check if a module is part of the Python standard library.
+    A module is considered standard library if it's a built-in,
+    or if its source file is not in a 'site-packages' or 'dist-packages' directory.
+    """
+    # A quick check for common invalid module names from AST parsing
+    if not _IDENT_RE.match(module_name):
+        return True  # Not a valid package name, treat as "not installable"
+
+    if module_name in sys.builtin_module_names:
+        return True
+
+    # Known stdlib names need no trip through the import machinery
+    if module_name in _STDLIB_MODULES:
+        return True
+
+    import importlib.util
+    
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ValueError, ModuleNotFoundError, ImportError):
+        # If find_spec fails, it's likely not a stdlib module we can import,
+        # so it's probably a missing package.
+        return False
+
+    if spec is None:
+        # Module not found, so it must be a missing package.
+        return False
+
+    origin = spec.origin
+    if origin is None or origin == 'built-in':
+        # `origin` is None for namespace packages.
+        # `origin` is 'built-in' for C modules.
+        return True
+
+    # The most reliable check: third-party packages are in `site-packages`
+    # or `dist-packages`. Stdlib modules are not.
+    return 'site-packages' not in origin and 'dist-packages' not in origin
+
+def _line_starts(text):
+    """Return the offset at which each line of text starts"""
+    # str.find jumps between newlines in C instead of visiting every character
+    starts = [0]
+    append = starts.append
+    find = text.find
+    i = find('\n')
+    while i != -1:
+        append(i + 1)
+        i = find('\n', i + 1)
+    return starts
+
+def _has_astral(text):
+    """Return whether Tk and Python disagree on column numbers anywhere in text"""
+    return _TK_SURROGATE_PAIRS and not text.isascii() and _ASTRAL_RE.search(text) is not None
+
+def _tk_column(text, line_start, offset):
+    """Return the Tk column of offset on the line of text starting at line_start"""
+    return offset - line_start + len(_ASTRAL_RE.findall(text, line_start, offset))
+
+def _str_column(text, line_start, column):
+    """Return the offset of Tk column on the line of text starting at line_start"""
+    offset = line_start
+    end = len(text)
+    while column > 0 and offset < end and text[offset] != '\n':
+        column -= 2 if text[offset] > '\uffff' else 1
+        offset += 1
+    return offset
+
+def _changed_span(old, new):
+    """Return the (start, end) offsets of the part of new that differs from old"""
+    # Binary search on slice equality, so each probe is a single C comparison
+    limit = min(len(old), len(new))
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+    
+    # Common suffix, not overlapping the common prefix
+    lo, hi = 0, limit - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return prefix, len(new) - lo
+
+@functools.lru_cache(maxsize=None)
+def _build_lexer(keywords):
+    """Return a token iterator specialised for the given keyword frozenset"""
+    # Longest alternatives first, so a keyword is never cut short by one of its prefixes
+    keyword_pattern = '|'.join(sorted(keywords, key=lambda kw: (-len(kw), kw)))
+    
+    # One pattern for every token kind, scanned in a single pass; group names are tag names
+    pattern = re.compile(
+        r'(?P<comment>#[^\n]*)'
+        r'|(?P<string>(?:\b[rRbBuUfF]{1,2})?'
+        r'(?:"""(?:\\[\s\S]|[^\\])*?"""|\'\'\'(?:\\[\s\S]|[^\\])*?\'\'\''
+        r'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'))'
+        r'|(?P<keyword>\b(?:' + keyword_pattern + r')\b)'
+        r'|(?P<number>\b(?:0[xX][0-9a-fA-F_]+|0[bB][01_]+|0[oO][0-7_]+'
+        r'|\d[\d_]*\.?[\d_]*(?:[eE][+-]?\d[\d_]*)?[jJ]?)\b)'
+        r'|(?P<function>\b[A-Za-z_]\w*(?=\())'
+    )
+    
+    # The bound finditer is the whole lexer; callers skip the attribute lookup
+    return pattern.finditer
+
+class _InsightsVisitor(ast.NodeVisitor):
+    """Collects functions, classes, imports and variables in a single pass"""
+    
+    def __init__(self):
+        self.functions = []
+        self.classes = []
+        self.imports = []
+        self.variables = []
+    
+    def visit_FunctionDef(self, node):
+        self.functions.append({
+            'name': node.name,
+            'line': node.lineno,
+            'args': len(node.args.args)
+        })
+        self.generic_visit(node)
+    
+    def visit_ClassDef(self, node):
+        self.classes.append({
+            'name': node.name,
+            'line': node.lineno
+        })
+        self.generic_visit(node)
+    
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append(alias.name)
+    
+    def visit_ImportFrom(self, node):
+        if node.module:
+            for alias in node.names:
+                self.imports.append(f"{node.module}.{alias.name}")
+    
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self.variables.append(target.id)
+        self.generic_visit(node)
+
 class CodeAnalyzer:
     """Analyzes Python code to provide insights and suggestions"""
     
+    # Syntax check results and insights keyed by a digest of the source (LRU order);
+    # trees are not kept, as one for a large buffer runs to tens of megabytes
+    _cache = OrderedDict()
+    _cache_size = 64
+    _cache_lock = threading.Lock()
+    
+    # (code, insights) of the most recent analysis, checked before hashing
+    _last_analysis = None
+    
+    @staticmethod
+    def source_digest(code):
+        """Return a compact digest of the source, used as cache key"""
+        if isinstance(code, str):
+            code = code.encode('utf-8', 'surrogatepass')
+        import hashlib  # Deferred: only needed once code is analysed
+        return hashlib.blake2b(code, digest_size=16).digest()
+    
+    @classmethod
+    def _cache_get(cls, key):
+        """Return the cached (syntax_ok, insights) entry for key, if any"""
+        with cls._cache_lock:
+            entry = cls._cache.get(key)
+            if entry is not None:
+                cls._cache.move_to_end(key)
+            return entry
+    
+    @classmethod
+    def _cache_put(cls, key, syntax_ok, insights):
+        """Store a (syntax_ok, insights) entry, evicting the least recently used"""
+        with cls._cache_lock:
+            cls._cache[key] = (syntax_ok, insights)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls._cache_size:
+                cls._cache.popitem(last=False)
+    
     @staticmethod
-    def analyze_code(code):
+    def _compile_ast(code, filename):
+        """Compile source straight to an AST, without inheriting future flags"""
+        return compile(code, filename, 'exec', flags=ast.PyCF_ONLY_AST, dont_inherit=True)
+    
+    @classmethod
+    def check_syntax(cls, code, filename='<editor>'):
+        """Raise SyntaxError if code does not parse, skipping source already known to be valid"""
+        key = cls.source_digest(code)
+        entry = cls._cache_get(key)
+        if entry is not None and entry[0]:
+            return
+        
+        # Failures are parsed again so the error carries this filename
+        cls._compile_ast(code, filename)
+        cls._cache_put(key, True, entry[1] if entry is not None else None)
+    
+    @classmethod
+    def analyze_code(cls, code):
         """Analyze code and return insights"""
+        # Re-analysing the same buffer is the common case; a string compare
+        # (length first, then memcmp) is cheaper than hashing the source
+        last = cls._last_analysis
+        if last is not None and last[0] == code:
+            return last[1]
+        
+        key = cls.source_digest(code)
+        entry = cls._cache_get(key)
+        if entry is not None and entry[1] is not None:
+            cls._last_analysis = (code, entry[1])
+            return entry[1]
+        
         insights = {
             'functions': [],
             'classes': [],
@@ -33,33 +401,15 @@ class CodeAnalyzer:
             'complexity_score': 0,
             'suggestions': []
         }
-        
         try:
-            tree = ast.parse(code)
+            tree = cls._compile_ast(code, '<editor>')
             
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    insights['functions'].append({
-                        'name': node.name,
-                        'line': node.lineno,
-                        'args': len(node.args.args)
-                    })
-                elif isinstance(node, ast.ClassDef):
-                    insights['classes'].append({
-                        'name': node.name,
-                        'line': node.lineno
-                    })
-                elif isinstance(node, ast.Import):
-                    for alias in node.names:
-                        insights['imports'].append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        for alias in node.names:
-                            insights['imports'].append(f"{node.module}.{alias.name}")
-                elif isinstance(node, ast.Assign):
-                    for target in node.targets:
-                        if isinstance(target, ast.Name):
-                            insights['variables'].append(target.id)
+            visitor = _InsightsVisitor()
+            visitor.visit(tree)
+            insights['functions'] = visitor.functions
+            insights['classes'] = visitor.classes
+            insights['imports'] = visitor.imports
+            insights['variables'] = visitor.variables
             
             # Calculate complexity score (simplified)
             insights['complexity_score'] = len(insights['functions']) * 2 + len(insights['classes']) * 3
@@ -73,16 +423,73 @@ class CodeAnalyzer:
                 
         except SyntaxError as e:
             insights['syntax_error'] = str(e)
-            
+        
+        cls._cache_put(key, 'syntax_error' not in insights, insights)
+        cls._last_analysis = (code, insights)
         return insights
 
+def _extract_file_imports(file_path):
+    """Return the top-level modules imported by a single file"""
+    # Module-level so it can be pickled into worker processes
+    try:
+        content = _read_file_bytes(file_path)
+    except OSError:
+        return set()
+    
+    # Scan tokens rather than building an AST: cheaper, and a syntax error
+    # further down the file still leaves the imports found before it
+    modules = set()
+    mode = None
+    prev_string = prev_type = None
+    try:
+        # tokenize() reads the raw bytes and honours any coding cookie itself
+        for token in tokenize.tokenize(io.BytesIO(content).readline):
+            tok_type, string = token.type, token.string
+            if tok_type in (tokenize.NL, tokenize.COMMENT, tokenize.ENCODING):
+                continue
+            
+            if tok_type == tokenize.NEWLINE or string == ';':
+                mode = None
+            elif mode == 'import':
+                # "import a.b as c, d": modules follow the keyword or a comma
+                if tok_type == tokenize.NAME and prev_string in ('import', ','):
+                    modules.add(string)
+            elif mode == 'from':
+                # Relative imports ("from . import x", "from .a import b") are skipped
+                if tok_type == tokenize.NAME:
+                    modules.add(string)
+                mode = None
+            elif tok_type == tokenize.NAME and string in ('import', 'from') and (
+                    prev_type in (None, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT)
+                    or prev_string in (';', ':')):
+                # Only at the start of a statement, not "yield from" / "raise ... from"
+                mode = string
+            
+            prev_string, prev_type = string, tok_type
+    except Exception:
+        # Syntax or decoding errors (e.g. a file that isn't UTF-8): keep what was found
+        pass
+    return modules
+
 class DependencyManager:
     """Manages project dependencies and virtual environments"""
     
+    # Number of changed files from which parsing is spread over processes;
+    # below it, starting the workers costs more than it saves
+    _process_pool_threshold = 200
+    
+    # Seconds an installed-package listing is trusted, so installs made
+    # outside the IDE still show up without a manual refresh
+    _installed_cache_ttl = 5.0
+    
     def __init__(self, project_path=None):
         self.project_path = project_path
         self.venv_path = None
         self.python_executable = sys.executable
+        self._installed_cache = None
+        self._installed_cache_time = 0.0
+        self._imports_cache = {}
+        self._detected_for_path = None
         
         if project_path:
             self.detect_venv()
@@ -91,6 +498,11 @@ class DependencyManager:
         """Detect virtual environment in project"""
         if not self.project_path:
             return False
+        
+        # The result only changes with the project path (or a newly created venv)
+        if self._detected_for_path == self.project_path:
+            return self.venv_path is not None
+        self._detected_for_path = self.project_path
             
         venv_candidates = ['venv', 'env', '.venv', '.env']
         for candidate in venv_candidates:
@@ -105,6 +517,7 @@ class DependencyManager:
                 if os.path.exists(python_exe):
                     self.venv_path = potential_venv
                     self.python_executable = python_exe
+                    self._installed_cache = None
                     return True
         self.venv_path = None
         self.python_executable = sys.executable
@@ -119,7 +532,8 @@ class DependencyManager:
         if os.path.exists(venv_path):
             raise Exception(f"Virtual environment '{venv_name}' already exists")
         
-        # Create virtual environment
+        # Create virtual environment (venv is only needed here, so import it lazily)
+        import venv
         venv.create(venv_path, with_pip=True)
         
         self.venv_path = venv_path
@@ -127,115 +541,174 @@ class DependencyManager:
             self.python_executable = os.path.join(venv_path, 'Scripts', 'python.exe')
         else:  # Unix/Linux/macOS
             self.python_executable = os.path.join(venv_path, 'bin', 'python')
+        self._installed_cache = None
+        self._detected_for_path = None
         
         return True
     
+    def get_site_packages_dirs(self):
+        """Get the site-packages directories of the project's virtual environment"""
+        if not self.venv_path:
+            return []
+        
+        if os.name == 'nt':  # Windows
+            candidates = [os.path.join(self.venv_path, 'Lib', 'site-packages')]
+        else:  # Unix/Linux/macOS
+            import glob
+            candidates = glob.glob(os.path.join(self.venv_path, 'lib', 'python*', 'site-packages'))
+        return [path for path in candidates if os.path.isdir(path)]
+    
     def get_installed_packages(self):
         """Get list of installed packages in current environment"""
+        now = time.monotonic()
+        if self._installed_cache is not None and now - self._installed_cache_time < self._installed_cache_ttl:
+            return self._installed_cache
+        
+        # Read package metadata in-process instead of spawning `pip list`;
+        # importlib.metadata is slow to import, so it is loaded on first use
+        try:
+            from importlib import metadata as importlib_metadata
+        except ImportError:  # Python < 3.8
+            importlib_metadata = None
+        search_path = self.get_site_packages_dirs() if self.venv_path else None
+        if importlib_metadata is not None and (search_path is None or search_path):
+            try:
+                if search_path is None:
+                    distributions = importlib_metadata.distributions()
+                else:
+                    distributions = importlib_metadata.distributions(path=search_path)
+                
+                packages = {}
+                for dist in distributions:
+                    name = dist.metadata['Name']
+                    if name:
+                        # The first distribution found on the path wins, as for imports
+                        packages.setdefault(name.lower(), dist.version)
+                self._installed_cache = packages
+                self._installed_cache_time = now
+                return packages
+            except Exception:
+                pass
+        
         try:
             result = subprocess.run(
                 [self.python_executable, '-m', 'pip', 'list', '--format=json'],
                 capture_output=True,
                 text=True,
                 check=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                creationflags=_SUBPROCESS_FLAGS,
+                startupinfo=_STARTUPINFO
             )
             packages = json.loads(result.stdout)
-            return {pkg['name'].lower(): pkg['version'] for pkg in packages}
+            self._installed_cache = {pkg['name'].lower(): pkg['version'] for pkg in packages}
+            self._installed_cache_time = now
+            return self._installed_cache
         except Exception:
             return {}
     
     def analyze_imports(self, code_files):
         """Analyze import statements in code files"""
-        imports = set()
+        if not code_files:
+            return set()
         
+        # Reuse the imports of files whose mtime and size are unchanged
+        results = []
+        stale = []
         for file_path in code_files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                tree = ast.parse(content)
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Import):
-                        for alias in node.names:
-                            imports.add(alias.name.split('.')[0])
-                    elif isinstance(node, ast.ImportFrom):
-                        if node.module:
-                            imports.add(node.module.split('.')[0])
-            except Exception:
+                st = os.stat(file_path)
+                stamp = (st.st_mtime_ns, st.st_size)
+            except OSError:
                 continue
+            cached = self._imports_cache.get(file_path)
+            if cached is not None and cached[0] == stamp:
+                results.append(cached[1])
+            else:
+                stale.append((file_path, stamp))
+        
+        if stale:
+            paths = [file_path for file_path, _ in stale]
+            for (file_path, stamp), modules in zip(stale, self._parse_imports(paths)):
+                self._imports_cache[file_path] = (stamp, modules)
+                results.append(modules)
+        
+        return set().union(*results)
+    
+    def _parse_imports(self, paths):
+        """Extract the imports of each path, in order, using a worker pool"""
+        # Large batches are parsed in separate processes, which run in parallel
+        # despite the GIL; small ones on threads, which overlap the file reads
+        workers = min(len(paths), os.cpu_count() or 1)
+        if len(paths) >= self._process_pool_threshold and workers > 1:
+            # Deferred: multiprocessing is only needed for large projects
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # Never fork: the IDE process has Tk and worker threads running, and a
+            # forked child can deadlock on a lock one of them held
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                    return list(executor.map(_extract_file_imports, paths,
+                                             chunksize=max(1, len(paths) // (workers * 4))))
+            except Exception:
+                # e.g. process creation unavailable; fall back to threads
+                pass
         
-        return imports
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+            return list(executor.map(_extract_file_imports, paths))
     
     @staticmethod
     def is_standard_library(module_name):
-        """
-        Check if a module is part of the Python standard library.
-        A module is considered standard library if it's a built-in,
-        or if its source file is not in a 'site-packages' or 'dist-packages' directory.
-        """
-        # A quick check for common invalid module names from AST parsing
-        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', module_name):
-            return True  # Not a valid package name, treat as "not installable"
-
-        if module_name in sys.builtin_module_names:
-            return True
-
-        try:
-            spec = importlib.util.find_spec(module_name)
-        except (ValueError, ModuleNotFoundError, ImportError):
-            # If find_spec fails, it's likely not a stdlib module we can import,
-            # so it's probably a missing package.
-            return False
-
-        if spec is None:
-            # Module not found, so it must be a missing package.
-            return False
-
-        origin = spec.origin
-        if origin is None or origin == 'built-in':
-            # `origin` is None for namespace packages.
-            # `origin` is 'built-in' for C modules.
-            return True
-
-        # The most reliable check: third-party packages are in `site-packages`
-        # or `dist-packages`. Stdlib modules are not.
-        return 'site-packages' not in origin and 'dist-packages' not in origin
+        """Check if a module is part of the Python standard library"""
+        # Results are memoized per top-level module name, see _is_stdlib
+        return _is_stdlib(module_name.partition('.')[0])
 
     def get_missing_packages(self, imports):
         """Get packages that are imported but not installed."""
-        installed = self.get_installed_packages()
-        
-        # Special cases where import name differs from package name
-        import_to_package_map = {
-            'pil': 'pillow',
-            'yaml': 'pyyaml',
-            'cv2': 'opencv-python',
-            'skimage': 'scikit-image',
-            'sklearn': 'scikit-learn',
-            'bs4': 'beautifulsoup4',
-        }
-
+        installed_names = self.get_installed_packages().keys()
+        
         missing = set()
         for imp in imports:
             if self.is_standard_library(imp):
                 continue
             
+            # Mapped names are canonical package names; others install under the import name
             imp_lower = imp.lower()
-            package_name = import_to_package_map.get(imp_lower, imp_lower)
-            
-            if package_name not in installed:
-                # Use the mapped package name for installation
-                install_name = import_to_package_map.get(imp_lower, imp)
-                missing.add(install_name)
+            mapped_name = _IMPORT_TO_PACKAGE.get(imp_lower)
+            if (mapped_name or imp_lower) not in installed_names:
+                missing.add(mapped_name or imp)
         
-        return sorted(list(missing))
+        return sorted(missing)
 
-    def install_packages(self, packages, output_callback=None):
+    def install_packages(self, packages, output_callback=None, parallel=False):
         """Install packages using pip"""
         if not packages:
             return True
         
+        # Independent packages can be installed by concurrent pip processes. Requirements
+        # with version specifiers or extras may need co-resolution, so they use one call.
+        if parallel and len(packages) > 1 and not any(_REQUIREMENT_SPEC_RE.search(pkg) for pkg in packages):
+            workers = min(4, os.cpu_count() or 1, len(packages))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda pkg: self._run_pip_install([pkg], output_callback, prefix=f"[{pkg}] "),
+                    packages
+                ))
+            
+            # Concurrent installs can trip over shared dependencies, so retry failures together
+            failed = [pkg for pkg, success in zip(packages, results) if not success]
+            if failed:
+                if output_callback:
+                    output_callback(f"\nRetrying {', '.join(failed)}...\n")
+                return self._run_pip_install(failed, output_callback)
+            return True
+        
+        return self._run_pip_install(packages, output_callback)
+    
+    def _run_pip_install(self, packages, output_callback=None, prefix=''):
+        """Run a single pip install for packages, optionally prefixing each output line"""
         try:
             cmd = [self.python_executable, '-m', 'pip', 'install'] + packages
             
@@ -245,22 +718,38 @@ class DependencyManager:
                     cmd,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
-                    text=True,
-                    universal_newlines=True,
-                    bufsize=1,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                    bufsize=1 << 16,
+                    creationflags=_SUBPROCESS_FLAGS,
+                    startupinfo=_STARTUPINFO
                 )
                 
-                for line in iter(process.stdout.readline, ''):
-                    output_callback(line)
+                if prefix:
+                    # Tag complete lines so concurrent installs stay readable
+                    pending = ['']
+                    def prefixed_callback(text):
+                        lines = (pending[0] + text).split('\n')
+                        pending[0] = lines.pop()
+                        if lines:
+                            output_callback(''.join(f"{prefix}{line}\n" for line in lines))
+                    
+                    _stream_output(process.stdout, prefixed_callback)
+                    if pending[0]:
+                        output_callback(f"{prefix}{pending[0]}\n")
+                else:
+                    # Output is passed on in decoded chunks rather than line by line
+                    _stream_output(process.stdout, output_callback)
                 
                 process.wait()
+                if process.returncode == 0:
+                    self._installed_cache = None
                 return process.returncode == 0
             else:
                 result = subprocess.run(
                     cmd, check=True, capture_output=True, text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                    creationflags=_SUBPROCESS_FLAGS,
+                    startupinfo=_STARTUPINFO
                 )
+                self._installed_cache = None
                 return True
                 
         except subprocess.CalledProcessError as e:
@@ -283,6 +772,17 @@ class SnippetManager:
             'Dictionary Comprehension': 'result = {key: value for key, value in items.items()}\n'
         }
 
+class NotifyingQueue(queue.Queue):
+    """Queue that calls on_put after every put, so consumers need not poll"""
+    
+    def __init__(self, on_put, maxsize=0):
+        super().__init__(maxsize)
+        self.on_put = on_put
+    
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        self.on_put()
+
 class OutputRedirector:
     """Redirects stdout to the output widget"""
     
@@ -296,6 +796,19 @@ class OutputRedirector:
     def flush(self):
         pass
 
+class ConsoleWriter(io.TextIOBase):
+    """File-like object that appends written text to the console widget"""
+    
+    def __init__(self, text_widget):
+        self.text_widget = text_widget
+    
+    def writable(self):
+        return True
+    
+    def write(self, string):
+        self.text_widget.insert("end", string)
+        return len(string)
+
 class PyGUIde:
     def __init__(self):
         self.root = ctk.CTk()
@@ -306,24 +819,60 @@ class PyGUIde:
         # Initialize components
         self.current_file = None
         self.project_path = None
+        self._project_root_key = None
+        # Working directory, tracked here so UI refreshes need no getcwd() call
+        self._cwd = os.getcwd()
         self.code_analyzer = CodeAnalyzer()
         self.snippet_manager = SnippetManager()
         self.dependency_manager = DependencyManager()
-        self.output_queue = queue.Queue()
+        self.output_queue = NotifyingQueue(self.notify_output_ready)
+        self._output_event_pending = False
+        self.running_process = None
+        
+        # Pending after() ids of the debounced highlight, analysis and dependency refresh,
+        # and of the status bar reset
+        self._highlight_after_id = None
+        self._analyze_after_id = None
+        self._deps_after_id = None
+        self._status_after_id = None
+        
+        # Code analysis runs on a single background worker; only the result
+        # for the most recently submitted buffer is displayed
+        self._analysis_executor = ThreadPoolExecutor(max_workers=1)
+        self._analysis_pending_code = None
+        
+        # Import analysis for the dependency panel, likewise kept off the UI thread;
+        # results of all but the latest refresh are discarded
+        self._deps_executor = ThreadPoolExecutor(max_workers=1)
+        self._deps_generation = 0
+        
+        # First and last visible lines (and pixel offset) the gutter was last drawn for
+        self._line_numbers_view = None
+        
+        # Project python file list, reused while the project root is unchanged
+        self._py_files_cache = None
+        self._py_files_key = None
+        
+        # Whether the last project is reopened (scanned in the background) at startup
+        self.reopen_last_project = tk.BooleanVar(self.root, value=False)
+        
+        # Whether Install All runs one pip process per package; off by default, as
+        # concurrent installs into one site-packages can race on shared dependencies
+        self.parallel_installs = tk.BooleanVar(self.root, value=False)
         
         # Create the UI
         self.create_menu()
         self.create_main_layout()
         self.create_status_bar()
         
-        # Start monitoring output queue
-        self.monitor_output_queue()
+        # Drain the output queue whenever a producer signals new items
+        self.root.bind("<<OutputReady>>", self.monitor_output_queue)
         
         # Bind events
         self.bind_events()
         
-        # Load settings
-        self.load_settings()
+        # Load settings once the window has been drawn
+        self.root.after_idle(self.load_settings)
         
     def create_menu(self):
         """Create the main menu bar"""
@@ -354,8 +903,11 @@ class PyGUIde:
         # Project menu
         project_menu = tk.Menu(menubar, tearoff=0)
         project_menu.add_command(label="Create Virtual Environment", command=self.create_venv)
-        project_menu.add_command(label="Refresh Dependencies", command=self.refresh_dependencies)
+        project_menu.add_command(label="Refresh Dependencies", command=self.rescan_dependencies)
         project_menu.add_command(label="Install All Missing Packages", command=self.install_missing_packages)
+        project_menu.add_separator()
+        project_menu.add_checkbutton(label="Reopen Last Project on Startup", variable=self.reopen_last_project)
+        project_menu.add_checkbutton(label="Install Packages in Parallel", variable=self.parallel_installs)
         menubar.add_cascade(label="Project", menu=project_menu)
         
         # Run menu
@@ -459,12 +1011,18 @@ class PyGUIde:
         self.deps_list = ctk.CTkScrollableFrame(self.deps_frame)
         self.deps_list.pack(fill="both", expand=True, padx=5, pady=5)
         
+        # Row widgets are created on demand and reused across refreshes
+        self._dep_widgets = []
+        self._no_files_label = ctk.CTkLabel(self.deps_list, text="No Python files to analyze.")
+        self._missing_font = ctk.CTkFont(weight="bold")
+        self._version_font = ctk.CTkFont()
+        
         # Control buttons
         buttons_frame = ctk.CTkFrame(self.dependencies_tab)
         buttons_frame.pack(fill="x", padx=5, pady=5)
         
         self.refresh_deps_btn = ctk.CTkButton(buttons_frame, text="Refresh", 
-                                            command=self.refresh_dependencies)
+                                            command=self.rescan_dependencies)
         self.refresh_deps_btn.pack(side="left", padx=2)
         
         self.install_all_btn = ctk.CTkButton(buttons_frame, text="Install All Missing", 
@@ -503,15 +1061,20 @@ class PyGUIde:
                                     font=ctk.CTkFont(size=16, weight="bold"))
         snippets_title.pack(pady=(5, 10))
         
-        # Snippets listbox
-        self.snippets_frame = ctk.CTkScrollableFrame(self.snippets_tab)
-        self.snippets_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        ctk.CTkLabel(self.snippets_tab, text="Double-click a snippet to insert it").pack(pady=(0, 5))
+        
+        # Snippets listbox (a single widget, one row per snippet)
+        self.snippets_list = tk.Listbox(self.snippets_tab, activestyle='none', border=0,
+                                      highlightthickness=0, background='#2b2b2b',
+                                      foreground='#ffffff', selectbackground='#1f6aa5',
+                                      font=('Consolas', 11))
+        self.snippets_list.pack(fill="both", expand=True, padx=5, pady=5)
         
         for snippet_name in self.snippet_manager.snippets.keys():
-            btn = ctk.CTkButton(self.snippets_frame, text=snippet_name, 
-                              command=lambda name=snippet_name: self.insert_snippet(name),
-                              height=30)
-            btn.pack(fill="x", pady=2)
+            self.snippets_list.insert("end", snippet_name)
+        
+        self.snippets_list.bind('<Double-Button-1>', self.on_snippet_activate)
+        self.snippets_list.bind('<Return>', self.on_snippet_activate)
     
     def create_file_explorer(self):
         """Create a simple file explorer"""
@@ -524,14 +1087,22 @@ class PyGUIde:
         self.project_path_label.pack(pady=5)
         
         # Current directory label
-        self.current_dir_label = ctk.CTkLabel(self.explorer_tab, text="Current: " + os.getcwd())
+        self.current_dir_label = ctk.CTkLabel(self.explorer_tab, text="Current: " + self._cwd)
         self.current_dir_label.pack(pady=5)
         
-        # File list
-        self.file_list = ctk.CTkScrollableFrame(self.explorer_tab)
+        # File listbox (a single widget, one row per entry)
+        self.file_list = tk.Listbox(self.explorer_tab, activestyle='none', border=0,
+                                  highlightthickness=0, background='#2b2b2b',
+                                  foreground='#ffffff', selectbackground='#1f6aa5',
+                                  font=('Consolas', 11))
         self.file_list.pack(fill="both", expand=True, padx=5, pady=5)
+        self._file_list_paths = []
         
-        self.refresh_file_list()
+        self.file_list.bind('<Double-Button-1>', self.on_file_activate)
+        self.file_list.bind('<Return>', self.on_file_activate)
+        
+        # Populate after the first paint instead of blocking UI creation
+        self.root.after_idle(self.refresh_file_list)
         
         # Control buttons
         buttons_frame = ctk.CTkFrame(self.explorer_tab)
@@ -608,10 +1179,12 @@ class PyGUIde:
         self.editor_container.grid_rowconfigure(0, weight=1)
         self.editor_container.grid_columnconfigure(1, weight=1)
         
-        # Line numbers
-        self.line_numbers = tk.Text(self.editor_container, width=4, padx=3, takefocus=0,
-                                  border=0, state='disabled', wrap='none', background='#2b2b2b',
-                                  foreground='#666666', font=('Consolas', 11))
+        # Line numbers, drawn on a canvas for the visible lines only
+        self._line_number_font = tkfont.Font(family='Consolas', size=11)
+        self._line_number_color = '#666666'
+        self.line_numbers = tk.Canvas(self.editor_container, takefocus=0, highlightthickness=0,
+                                      border=0, background='#2b2b2b',
+                                      width=self._line_number_font.measure("0000") + 6)
         self.line_numbers.grid(row=0, column=0, sticky="nsew")
         
         # Code editor
@@ -622,9 +1195,9 @@ class PyGUIde:
         self.code_editor.grid(row=0, column=1, sticky="nsew")
         
         # Scrollbars
-        v_scrollbar = tk.Scrollbar(self.editor_container, orient="vertical")
-        v_scrollbar.grid(row=0, column=2, sticky="ns")
-        v_scrollbar.config(command=self.on_scrollbar)
+        self.v_scrollbar = tk.Scrollbar(self.editor_container, orient="vertical")
+        self.v_scrollbar.grid(row=0, column=2, sticky="ns")
+        self.v_scrollbar.config(command=self.code_editor.yview)
         
         h_scrollbar = tk.Scrollbar(self.editor_container, orient="horizontal")
         h_scrollbar.grid(row=1, column=1, sticky="ew")
@@ -639,6 +1212,8 @@ class PyGUIde:
         self.code_editor.bind('<KeyRelease>', self.on_key_release)
         self.code_editor.bind('<Button-1>', self.on_click)
         self.code_editor.bind('<MouseWheel>', self.on_mousewheel)
+        # Pasted text can span many lines, so retag the whole buffer afterwards
+        self.code_editor.bind('<<Paste>>', lambda e: self.root.after_idle(self.highlight_syntax))
     
     def create_output_area(self):
         """Create the output area with tabs"""
@@ -679,10 +1254,12 @@ class PyGUIde:
         self.console_input.grid(row=1, column=0, sticky="ew", padx=5, pady=5)
         self.console_input.bind('<Return>', self.execute_console_command)
         
-        # Welcome message
-        self.console_output.insert("1.0", "PyGUIde Interactive Console\n")
-        self.console_output.insert("end", "Python " + sys.version + "\n")
-        self.console_output.insert("end", ">>> ")
+        # One interpreter for the whole session, so names persist between commands
+        self.console_interpreter = None
+        self._console_writer = ConsoleWriter(self.console_output)
+        
+        # Welcome message (inserted in one go)
+        self.console_output.insert("1.0", f"PyGUIde Interactive Console\nPython {sys.version}\n>>> ")
     
     def create_status_bar(self):
         """Create the status bar"""
@@ -703,117 +1280,181 @@ class PyGUIde:
     def setup_syntax_highlighting(self):
         """Setup basic syntax highlighting"""
         # Define color schemes
-        self.code_editor.tag_configure("keyword", foreground="#569cd6")
-        self.code_editor.tag_configure("string", foreground="#ce9178")
-        self.code_editor.tag_configure("comment", foreground="#6a9955")
-        self.code_editor.tag_configure("number", foreground="#b5cea8")
-        self.code_editor.tag_configure("function", foreground="#dcdcaa")
+        self._tag_palette = {
+            'dark': {
+                "keyword": "#569cd6",
+                "string": "#ce9178",
+                "comment": "#6a9955",
+                "number": "#b5cea8",
+                "function": "#dcdcaa",
+            },
+            'light': {
+                "keyword": "#0000ff",
+                "string": "#a31515",
+                "comment": "#008000",
+                "number": "#098658",
+                "function": "#795e26",
+            },
+        }
+        self.apply_tag_palette(ctk.get_appearance_mode().lower())
         
         # Python keywords
-        self.keywords = ["def", "class", "if", "elif", "else", "while", "for", "try", 
-                        "except", "finally", "with", "as", "import", "from", "return", 
-                        "yield", "lambda", "and", "or", "not", "in", "is", "True", 
-                        "False", "None", "pass", "break", "continue", "global", "nonlocal"]
-    
-    def highlight_syntax(self):
-        """Apply syntax highlighting to the current text"""
-        content = self.code_editor.get("1.0", "end-1c")
+        self.keywords = frozenset(["def", "class", "if", "elif", "else", "while", "for", "try", 
+                                   "except", "finally", "with", "as", "import", "from", "return", 
+                                   "yield", "lambda", "and", "or", "not", "in", "is", "True", 
+                                   "False", "None", "pass", "break", "continue", "global", "nonlocal"])
+        self._lex = _build_lexer(self.keywords)
+    
+    def highlight_syntax(self, start_index="1.0", end_index="end"):
+        """Apply syntax highlighting to the current text (or only the given range)"""
+        start_index = self.code_editor.index(start_index)
+        end_index = self.code_editor.index(end_index)
+        content = self.code_editor.get(start_index, end_index)
         
         # Clear existing tags
         for tag in ["keyword", "string", "comment", "number", "function"]:
-            self.code_editor.tag_remove(tag, "1.0", "end")
-        
-        # Highlight keywords
-        for keyword in self.keywords:
-            start = "1.0"
-            while True:
-                pos = self.code_editor.search(r'\b' + keyword + r'\b', start, "end", regexp=True)
-                if not pos:
-                    break
-                end = f"{pos}+{len(keyword)}c"
-                self.code_editor.tag_add("keyword", pos, end)
-                start = end
-        
-        # Highlight strings
-        for quote in ['"', "'"]:
-            start = "1.0"
-            while True:
-                start_pos = self.code_editor.search(quote, start, "end")
-                if not start_pos:
-                    break
-                end_pos = self.code_editor.search(quote, f"{start_pos}+1c", "end")
-                if not end_pos:
-                    break
-                self.code_editor.tag_add("string", start_pos, f"{end_pos}+1c")
-                start = f"{end_pos}+1c"
+            self.code_editor.tag_remove(tag, start_index, end_index)
         
-        # Highlight comments
-        start = "1.0"
-        while True:
-            pos = self.code_editor.search("#", start, "end")
-            if not pos:
-                break
-            line_end = self.code_editor.search("\n", pos, "end")
-            if not line_end:
-                line_end = "end"
-            self.code_editor.tag_add("comment", pos, line_end)
-            start = line_end
-        
-        # Highlight numbers
-        start = "1.0"
-        while True:
-            pos = self.code_editor.search(r'\b\d+\.?\d*\b', start, "end", regexp=True)
-            if not pos:
-                break
-            # Find the end of the number
-            end = pos
-            while True:
-                char = self.code_editor.get(end)
-                if char.isdigit() or char == '.':
-                    end = f"{end}+1c"
-                else:
-                    break
-            self.code_editor.tag_add("number", pos, end)
-            start = end
+        # Offsets at which each line of content starts, to map matches to Tk indices
+        line_starts = _line_starts(content)
+        first_line, first_col = map(int, start_index.split('.'))
+        astral = _has_astral(content)
+        
+        def to_index(offset):
+            line = bisect.bisect_right(line_starts, offset) - 1
+            if astral:
+                col = _tk_column(content, line_starts[line], offset)
+            else:
+                col = offset - line_starts[line]
+            if line == 0:
+                col += first_col
+            return f"{first_line + line}.{col}"
+        
+        # Collect index pairs per tag, then add each tag's ranges in a single Tk call
+        ranges = {"keyword": [], "string": [], "comment": [], "number": [], "function": []}
+        for match in self._lex(content):
+            ranges[match.lastgroup] += (to_index(match.start()), to_index(match.end()))
+        
+        for tag, indices in ranges.items():
+            if indices:
+                self.code_editor.tag_add(tag, *indices)
+    
+    def highlight_range(self, start_index, end_index):
+        """Rehighlight the lines spanned by an edit, widening for multi-line strings"""
+        start_index = self.code_editor.index(f"{start_index} linestart")
+        end_index = self.code_editor.index(f"{end_index} lineend")
+        rescan_start, rescan_end = start_index, end_index
+        
+        # A triple quote on the edited lines may open or close a string further down
+        text = self.code_editor.get(start_index, end_index)
+        to_end = '"""' in text or "'''" in text
+        
+        # A string crossing into the edited lines must be rescanned from its start;
+        # if it also closes on these lines, the edit may have moved that delimiter
+        head = self.code_editor.tag_prevrange("string", start_index)
+        if head and self.code_editor.compare(head[1], ">", start_index):
+            rescan_start = self.code_editor.index(f"{head[0]} linestart")
+            if self.code_editor.compare(head[1], "<=", end_index):
+                to_end = True
+            else:
+                rescan_end = self.code_editor.index(f"{head[1]} lineend")
+        
+        # Likewise for a string opening on the edited lines and continuing below
+        tail = self.code_editor.tag_prevrange("string", end_index)
+        if tail and self.code_editor.compare(tail[1], ">", end_index):
+            if self.code_editor.compare(tail[0], ">=", start_index):
+                to_end = True
+            elif self.code_editor.compare(tail[1], ">", rescan_end):
+                rescan_end = self.code_editor.index(f"{tail[1]} lineend")
+        
+        self.highlight_syntax(rescan_start, "end" if to_end else rescan_end)
     
     def update_line_numbers(self):
         """Update line numbers"""
-        content = self.code_editor.get("1.0", "end-1c")
-        line_count = content.count('\n') + 1
-        
-        line_numbers_string = "\n".join(str(i) for i in range(1, line_count + 1))
+        editor = self.code_editor
+        top = editor.index("@0,0 linestart")
+        top_info = editor.dlineinfo(top)
+        # Only the visible lines are numbered, so nothing changes unless the
+        # first or last line on screen (or the pixel offset) does
+        view = (top, editor.index(f"@0,{editor.winfo_height()} linestart"), top_info and top_info[1])
+        if view == self._line_numbers_view:
+            return
+        self._line_numbers_view = view
         
-        self.line_numbers.config(state='normal')
-        self.line_numbers.delete("1.0", "end")
-        self.line_numbers.insert("1.0", line_numbers_string)
-        self.line_numbers.config(state='disabled')
-    
-    def on_scrollbar(self, *args):
-        """Handle scrollbar events"""
-        self.code_editor.yview(*args)
-        self.line_numbers.yview(*args)
+        canvas = self.line_numbers
+        canvas.delete("all")
+        x = int(canvas.cget("width")) - 3
+        index = top
+        while True:
+            info = editor.dlineinfo(index)
+            if info is None:
+                break
+            canvas.create_text(x, info[1], anchor="ne", text=index.split('.')[0],
+                               font=self._line_number_font, fill=self._line_number_color)
+            next_index = editor.index(f"{index}+1line")
+            if next_index == index:
+                break
+            index = next_index
     
-    def on_textscroll(self, *args):
-        """Handle text scroll events"""
-        self.line_numbers.yview_moveto(args[0])
-        self.code_editor.yview_moveto(args[0])
-        return "break"
+    def on_textscroll(self, first, last):
+        """Follow editor scrolling with the scrollbar and line numbers"""
+        # The editor is the only widget scrolled directly; everything else tracks it here
+        self.v_scrollbar.set(first, last)
+        self.update_line_numbers()
     
     def on_mousewheel(self, event):
         """Handle mouse wheel events"""
-        self.on_scrollbar('scroll', int(-1 * (event.delta / 120)), "units")
+        self.code_editor.yview_scroll(int(-1 * (event.delta / 120)), "units")
         return "break"
     
     def on_key_release(self, event):
         """Handle key release events"""
-        self.highlight_syntax()
-        self.update_line_numbers()
+        # Widen the pending dirty region to the edited line (and the one above,
+        # for Return/line joins); marks keep it valid across further edits
+        if self._highlight_after_id:
+            self.root.after_cancel(self._highlight_after_id)
+            if self.code_editor.compare("insert -1l linestart", "<", "hl_dirty_start"):
+                self.code_editor.mark_set("hl_dirty_start", "insert -1l linestart")
+            if self.code_editor.compare("insert lineend", ">", "hl_dirty_end"):
+                self.code_editor.mark_set("hl_dirty_end", "insert lineend")
+        else:
+            self.code_editor.mark_set("hl_dirty_start", "insert -1l linestart")
+            self.code_editor.mark_set("hl_dirty_end", "insert lineend")
+            self.code_editor.mark_gravity("hl_dirty_start", "left")
+        self._highlight_after_id = self.root.after(30, self.run_scheduled_highlight)
+        
         self.update_cursor_position()
         
         # Auto-analyze code on changes
-        if len(self.code_editor.get("1.0", "end-1c")) > 10:
-            self.root.after(2000, self.analyze_current_code)  # Delay analysis
-            self.root.after(3000, self.refresh_dependencies)  # Delay dependency refresh
+        # Compare indices rather than fetching the whole buffer on every keystroke
+        if self.code_editor.compare("1.0+10c", "<", "end-1c"):
+            # Restart the delays on every keystroke so the work runs once typing pauses
+            if self._analyze_after_id:
+                self.root.after_cancel(self._analyze_after_id)
+            self._analyze_after_id = self.root.after(2000, self.run_scheduled_analysis)  # Delay analysis
+            self.schedule_dependency_refresh(3000)  # Delay dependency refresh
+    
+    def run_scheduled_highlight(self):
+        """Rehighlight the region dirtied since the last scheduled highlight and renumber lines"""
+        self._highlight_after_id = None
+        self.highlight_range("hl_dirty_start", "hl_dirty_end")
+        self.update_line_numbers()
+    
+    def run_scheduled_analysis(self):
+        """Run the analysis scheduled by on_key_release"""
+        self._analyze_after_id = None
+        self.analyze_current_code()
+    
+    def schedule_dependency_refresh(self, delay):
+        """Refresh dependencies after delay ms, replacing any refresh still pending"""
+        if self._deps_after_id:
+            self.root.after_cancel(self._deps_after_id)
+        self._deps_after_id = self.root.after(delay, self.run_scheduled_dependency_refresh)
+    
+    def run_scheduled_dependency_refresh(self):
+        """Run the dependency refresh scheduled by schedule_dependency_refresh"""
+        self._deps_after_id = None
+        self.refresh_dependencies()
     
     def on_click(self, event):
         """Handle click events"""
@@ -837,24 +1478,50 @@ class PyGUIde:
         self.root.bind('<Control-h>', lambda e: self.replace_text())
         self.root.bind('<Control-z>', lambda e: self.undo())
         self.root.bind('<Control-y>', lambda e: self.redo())
+        # Replace the Text class undo/redo, which would otherwise run before the
+        # shortcuts above and undo a second, never rehighlighted, step
+        self.code_editor.bind('<<Undo>>', self.undo)
+        self.code_editor.bind('<<Redo>>', self.redo)
     
     def open_folder(self):
         """Open a folder as a project"""
         folder_path = filedialog.askdirectory(title="Select Project Folder")
         if folder_path:
-            self.project_path = folder_path
-            self.dependency_manager = DependencyManager(folder_path)
-            
-            # Update UI
-            self.project_path_label.configure(text=f"Project: {os.path.basename(folder_path)}")
-            self.update_environment_indicator()
-            
-            # Change to project directory
-            os.chdir(folder_path)
-            self.refresh_file_list()
-            self.refresh_dependencies()
-            
-            self.set_status(f"Opened project: {folder_path}")
+            self.load_project(folder_path)
+    
+    def load_project(self, folder_path, dependency_manager=None, python_files=None):
+        """Make folder_path the current project, optionally with a preloaded manager and file scan"""
+        self.project_path = folder_path
+        # Resolved, since the cwd it is compared against is always a real path
+        self._project_root_key = _dir_key(os.path.realpath(folder_path))
+        self.dependency_manager = dependency_manager or DependencyManager(folder_path)
+        if python_files is None:
+            self._py_files_cache = None
+        else:
+            self._py_files_key, self._py_files_cache = python_files
+        
+        # Update UI
+        self.project_path_label.configure(text=f"Project: {os.path.basename(folder_path)}")
+        self.update_environment_indicator()
+        
+        # Change to project directory
+        self.set_cwd(folder_path)
+        self.refresh_file_list()
+        self.refresh_dependencies()
+        
+        self.set_status(f"Opened project: {folder_path}", sticky=True)
+    
+    def preload_project(self, folder_path):
+        """Detect the venv, scan the files and parse the imports of folder_path off the UI thread, then load it"""
+        try:
+            key = (folder_path, os.stat(folder_path).st_mtime_ns)
+            dependency_manager = DependencyManager(folder_path)
+            python_files = list(_walk_py(folder_path, _project_exclude_dirs(dependency_manager)))
+            # Fills the manager's import cache, so the first refresh has nothing left to parse
+            dependency_manager.analyze_imports(python_files)
+        except OSError:
+            return
+        self.post_output('project', (folder_path, dependency_manager, (key, python_files)))
     
     def update_environment_indicator(self):
         """Update the environment indicator in status bar and dependencies panel"""
@@ -924,73 +1591,70 @@ class PyGUIde:
         """Get a list of all python files in the project, excluding virtual environments."""
         python_files = []
         if self.project_path:
-            # Define directories to exclude from the scan
-            exclude_dirs = {'.git', '__pycache__', 'build', 'dist', '.vscode', 'venv', 'env', '.venv', '.env'}
-            if self.dependency_manager and self.dependency_manager.venv_path:
-                exclude_dirs.add(os.path.basename(self.dependency_manager.venv_path))
-
-            for root, dirs, files in os.walk(self.project_path, topdown=True):
-                # This modifies the list in-place, preventing os.walk from entering excluded folders
-                dirs[:] = [d for d in dirs if d not in exclude_dirs]
-                
-                for file in files:
-                    if file.endswith('.py'):
-                        python_files.append(os.path.join(root, file))
+            # Reuse the last walk unless the project or its top-level entries changed
+            try:
+                key = (self.project_path, os.stat(self.project_path).st_mtime_ns)
+            except OSError:
+                key = None
+            if self._py_files_cache is not None and key is not None and key == self._py_files_key:
+                return self._py_files_cache
+            
+            python_files = list(_walk_py(self.project_path, _project_exclude_dirs(self.dependency_manager)))
+            
+            self._py_files_cache = python_files
+            self._py_files_key = key
         elif self.current_file and self.current_file.endswith('.py'):
             python_files.append(self.current_file)
         
         return python_files
+    
+    def rescan_dependencies(self):
+        """Refresh dependencies after forgetting the cached project file list"""
+        self._py_files_cache = None
+        self.refresh_dependencies()
 
     def refresh_dependencies(self):
         """Refresh the dependencies list by analyzing only project source files."""
         if not hasattr(self, 'deps_list'):
             return
             
-        # Clear existing dependency widgets
-        for widget in self.deps_list.winfo_children():
-            widget.destroy()
-        
         python_files = self.get_project_python_files()
+        self._deps_generation += 1
         
         if not python_files:
-            no_files_label = ctk.CTkLabel(self.deps_list, text="No Python files to analyze.")
-            no_files_label.pack(pady=10)
+            self.show_dependency_rows([], set(), {})
+            self._no_files_label.pack(pady=10)
             return
+        self._no_files_label.pack_forget()
         
-        # Analyze imports from project files
-        imports = self.dependency_manager.analyze_imports(python_files)
-        missing_packages = self.dependency_manager.get_missing_packages(imports)
-        installed_packages = self.dependency_manager.get_installed_packages()
+        # Parsing every file of a cold project can take seconds; do it in the
+        # background and show the result when it is posted back
+        self._deps_executor.submit(self.collect_dependencies, self._deps_generation,
+                                   self.dependency_manager, python_files)
+    
+    def collect_dependencies(self, generation, dependency_manager, python_files):
+        """Analyze the imports of python_files on a worker thread and post the result"""
+        try:
+            imports = dependency_manager.analyze_imports(python_files)
+            missing_packages = dependency_manager.get_missing_packages(imports)
+            installed_packages = dependency_manager.get_installed_packages()
+        except Exception as e:
+            message = f"Dependency analysis failed: {e}"
+            self.root.after(0, lambda: self.set_status(message))
+            return
         
-        # Combine all relevant packages for display
-        all_deps = sorted(imports.union(set(installed_packages.keys())))
-
-        # Display dependencies
-        for dep in all_deps:
-            if self.dependency_manager.is_standard_library(dep):
-                continue
-
-            dep_frame = ctk.CTkFrame(self.deps_list)
-            dep_frame.pack(fill="x", padx=5, pady=2)
-            
-            # Package name
-            name_label = ctk.CTkLabel(dep_frame, text=dep, anchor="w")
-            name_label.pack(side="left", padx=10, pady=5)
-            
-            # Status
-            if dep in missing_packages:
-                status_label = ctk.CTkLabel(dep_frame, text="Missing", 
-                                          text_color="#F96666", font=ctk.CTkFont(weight="bold"))
-                # Install button
-                install_btn = ctk.CTkButton(dep_frame, text="Install", width=60,
-                                          command=lambda pkg=dep: self.install_package(pkg))
-                install_btn.pack(side="right", padx=5, pady=2)
-            else:
-                version = installed_packages.get(dep.lower(), "Installed")
-                status_label = ctk.CTkLabel(dep_frame, text=f"v{version}", 
-                                          text_color="#50C878")
-            
-            status_label.pack(side="right", padx=10, pady=5)
+        # Combine all relevant packages for display, leaving out the standard library
+        is_stdlib = dependency_manager.is_standard_library
+        all_deps = sorted(dep for dep in imports.union(installed_packages.keys()) if not is_stdlib(dep))
+        self.post_output('dependencies', (generation, all_deps, missing_packages, installed_packages))
+    
+    def show_dependencies(self, generation, all_deps, missing_packages, installed_packages):
+        """Show the dependencies found by collect_dependencies"""
+        # A later refresh (or another project) supersedes this result
+        if generation != self._deps_generation:
+            return
+        
+        self.show_dependency_rows(all_deps, set(missing_packages), installed_packages)
         
         # Update install all button state
         if missing_packages:
@@ -998,24 +1662,61 @@ class PyGUIde:
         else:
             self.install_all_btn.configure(state="disabled", text="All Dependencies Met")
     
+    def show_dependency_rows(self, deps, missing, installed_packages):
+        """Show one row per dependency, reusing the row widgets of earlier refreshes"""
+        for index, dep in enumerate(deps):
+            if index < len(self._dep_widgets):
+                dep_frame, name_label, status_label, install_btn = self._dep_widgets[index]
+            else:
+                dep_frame = ctk.CTkFrame(self.deps_list)
+                
+                # Package name
+                name_label = ctk.CTkLabel(dep_frame, text="", anchor="w")
+                name_label.pack(side="left", padx=10, pady=5)
+                
+                # Status, with the install button to its right when missing
+                status_label = ctk.CTkLabel(dep_frame, text="")
+                status_label.pack(side="right", padx=10, pady=5)
+                install_btn = ctk.CTkButton(dep_frame, text="Install", width=60)
+                
+                self._dep_widgets.append((dep_frame, name_label, status_label, install_btn))
+            
+            name_label.configure(text=dep)
+            if dep in missing:
+                status_label.configure(text="Missing", text_color="#F96666", font=self._missing_font)
+                install_btn.configure(command=lambda pkg=dep: self.install_package(pkg))
+                install_btn.pack(side="right", padx=5, pady=2, before=status_label)
+            else:
+                version = installed_packages.get(dep.lower(), "Installed")
+                status_label.configure(text=f"v{version}", text_color="#50C878", font=self._version_font)
+                install_btn.pack_forget()
+            
+            # Re-packing in order keeps hidden rows that come back in sequence
+            dep_frame.pack(fill="x", padx=5, pady=2)
+        
+        # Hide rows left over from a longer list
+        for dep_frame, _, _, _ in self._dep_widgets[len(deps):]:
+            dep_frame.pack_forget()
+    
     def install_package(self, package):
         """Install a single package"""
+        self.output_text.delete("1.0", "end")
+        self.output_text.insert("1.0", f"Installing {package}...\n")
+        self.set_status(f"Installing {package}...")
+        
         def install_thread():
+            # Output goes through the queue and is batched into the widget by monitor_output_queue
             def output_callback(line):
-                self.root.after(0, lambda: self.output_text.insert("end", line))
-            
-            self.root.after(0, lambda: self.output_text.delete("1.0", "end"))
-            self.root.after(0, lambda: self.output_text.insert("1.0", f"Installing {package}...\n"))
-            self.root.after(0, lambda: self.set_status(f"Installing {package}..."))
+                self.post_output('stdout', line)
             
             success = self.dependency_manager.install_packages([package], output_callback)
             
             if success:
-                self.root.after(0, lambda: self.output_text.insert("end", f"\n{package} installed successfully!\n"))
+                output_callback(f"\n{package} installed successfully!\n")
                 self.root.after(0, lambda: self.set_status(f"{package} installed successfully"))
                 self.root.after(0, self.refresh_dependencies)
             else:
-                self.root.after(0, lambda: self.output_text.insert("end", f"\nFailed to install {package}!\n"))
+                output_callback(f"\nFailed to install {package}!\n")
                 self.root.after(0, lambda: self.set_status(f"Failed to install {package}"))
         
         threading.Thread(target=install_thread, daemon=True).start()
@@ -1042,23 +1743,24 @@ class PyGUIde:
         if not result:
             return
         
+        self.output_text.delete("1.0", "end")
+        self.output_text.insert("1.0", f"Installing {len(missing_packages)} packages...\n")
+        self.set_status("Installing packages...")
+        parallel = self.parallel_installs.get()
+        
         def install_thread():
+            # Output goes through the queue and is batched into the widget by monitor_output_queue
             def output_callback(line):
-                self.root.after(0, lambda: self.output_text.insert("end", line))
-                self.root.after(0, lambda: self.output_text.see("end"))
+                self.post_output('stdout', line)
             
-            self.root.after(0, lambda: self.output_text.delete("1.0", "end"))
-            self.root.after(0, lambda: self.output_text.insert("1.0", f"Installing {len(missing_packages)} packages...\n"))
-            self.root.after(0, lambda: self.set_status("Installing packages..."))
-            
-            success = self.dependency_manager.install_packages(missing_packages, output_callback)
+            success = self.dependency_manager.install_packages(missing_packages, output_callback, parallel=parallel)
             
             if success:
-                self.root.after(0, lambda: self.output_text.insert("end", f"\nAll packages installed successfully!\n"))
+                output_callback(f"\nAll packages installed successfully!\n")
                 self.root.after(0, lambda: self.set_status("All packages installed successfully"))
                 self.root.after(0, self.refresh_dependencies)
             else:
-                self.root.after(0, lambda: self.output_text.insert("end", f"\nSome packages failed to install! Check the output for details.\n"))
+                output_callback(f"\nSome packages failed to install! Check the output for details.\n")
                 self.root.after(0, lambda: self.set_status("Some packages failed to install"))
         
         threading.Thread(target=install_thread, daemon=True).start()
@@ -1068,6 +1770,7 @@ class PyGUIde:
         if self.check_unsaved_changes():
             self.code_editor.delete("1.0", "end")
             self.current_file = None
+            self._py_files_cache = None
             self.file_label.configure(text="Untitled.py")
             self.update_line_numbers()
             self.set_status("New file created")
@@ -1075,7 +1778,7 @@ class PyGUIde:
     def open_file(self):
         """Open a file"""
         if self.check_unsaved_changes():
-            initial_dir = self.project_path if self.project_path else os.getcwd()
+            initial_dir = self.project_path if self.project_path else self._cwd
             file_path = filedialog.askopenfilename(
                 title="Open Python File",
                 initialdir=initial_dir,
@@ -1083,19 +1786,18 @@ class PyGUIde:
             )
             if file_path:
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        content = file.read()
+                    content = _read_text_file(file_path)
                     
-                    self.code_editor.delete("1.0", "end")
-                    self.code_editor.insert("1.0", content)
+                    self.set_editor_text(content)
                     self.current_file = file_path
                     self.file_label.configure(text=os.path.basename(file_path))
-                    self.highlight_syntax()
-                    self.update_line_numbers()
-                    self.set_status(f"Opened: {file_path}")
+                    # Number and highlight once the new text is on screen rather than before
+                    self.root.after_idle(self.update_line_numbers)
+                    self.root.after_idle(self.highlight_syntax)
+                    self.set_status(f"Opened: {file_path}", sticky=True)
                     
                     # Analyze dependencies if part of project
-                    self.root.after(1000, self.refresh_dependencies)
+                    self.schedule_dependency_refresh(1000)
                     
                 except Exception as e:
                     messagebox.showerror("Error", f"Could not open file: {str(e)}")
@@ -1109,7 +1811,7 @@ class PyGUIde:
                     file.write(content)
                 self.set_status(f"Saved: {self.current_file}")
                 # Refresh dependencies after saving
-                self.root.after(500, self.refresh_dependencies)
+                self.schedule_dependency_refresh(500)
             except Exception as e:
                 messagebox.showerror("Error", f"Could not save file: {str(e)}")
         else:
@@ -1117,7 +1819,7 @@ class PyGUIde:
     
     def save_as_file(self):
         """Save file with a new name"""
-        initial_dir = self.project_path if self.project_path else os.getcwd()
+        initial_dir = self.project_path if self.project_path else self._cwd
         file_path = filedialog.asksaveasfilename(
             title="Save Python File",
             initialdir=initial_dir,
@@ -1130,13 +1832,31 @@ class PyGUIde:
                 with open(file_path, 'w', encoding='utf-8') as file:
                     file.write(content)
                 self.current_file = file_path
+                self._py_files_cache = None
                 self.file_label.configure(text=os.path.basename(file_path))
                 self.set_status(f"Saved as: {file_path}")
                 # Refresh dependencies after saving
-                self.root.after(500, self.refresh_dependencies)
+                self.schedule_dependency_refresh(500)
             except Exception as e:
                 messagebox.showerror("Error", f"Could not save file: {str(e)}")
     
+    def set_editor_text(self, content):
+        """Replace the editor contents with content, inserting it in chunks"""
+        # One undo step for the whole load, which is then dropped along with
+        # the history of the previous file
+        autoseparators = self.code_editor.cget("autoseparators")
+        self.code_editor.configure(autoseparators=False)
+        try:
+            self.code_editor.delete("1.0", "end")
+            for start in range(0, len(content), _EDITOR_INSERT_CHUNK):
+                self.code_editor.insert("end", content[start:start + _EDITOR_INSERT_CHUNK])
+                # Let the first screenful paint while a large file is still loading
+                if start and start % (_EDITOR_INSERT_CHUNK * 16) == 0:
+                    self.root.update_idletasks()
+        finally:
+            self.code_editor.configure(autoseparators=autoseparators)
+        self.code_editor.edit_reset()
+    
     def check_unsaved_changes(self):
         """Check if there are unsaved changes"""
         # Simplified - in a real implementation, you'd track modifications
@@ -1151,8 +1871,9 @@ class PyGUIde:
         
         # Clear output
         self.output_text.delete("1.0", "end")
-        self.output_text.insert("1.0", f"Running code... ({datetime.now().strftime('%H:%M:%S')})\n")
+        self.output_text.insert("1.0", f"Running code... ({time.strftime('%H:%M:%S')})\n")
         self.output_text.insert("end", "=" * 50 + "\n")
+        self.output_text.insert("end", "\nOutput:\n")
         
         # Save code to temporary file if needed
         temp_file = None
@@ -1169,36 +1890,44 @@ class PyGUIde:
         try:
             # Run code in separate thread
             def run_in_thread():
+                return_code, error = -1, None
                 try:
                     # Use the correct Python executable (venv or global)
                     python_exe = self.dependency_manager.python_executable
                     
-                    # Create a subprocess to run the Python code
+                    # Create a subprocess to run the Python code; -u makes the
+                    # script flush its output as it prints instead of at exit
                     process = subprocess.Popen(
-                        [python_exe, file_to_run],
+                        [python_exe, '-u', file_to_run],
                         stdout=subprocess.PIPE,
                         stderr=subprocess.PIPE,
-                        text=True,
                         cwd=self.project_path if self.project_path else os.path.dirname(file_to_run),
-                        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                        creationflags=_SUBPROCESS_FLAGS,
+                        startupinfo=_STARTUPINFO
                     )
+                    self.running_process = process
                     
-                    stdout, stderr = process.communicate(timeout=30)  # 30 second timeout
+                    # Stream both pipes to the output panel as the script runs;
+                    # stderr gets its own reader so neither pipe can fill up and block
+                    post_text = lambda text: self.post_output('stdout', text)
+                    stderr_thread = threading.Thread(target=_stream_output, args=(process.stderr, post_text))
+                    stderr_thread.daemon = True
+                    stderr_thread.start()
+                    _stream_output(process.stdout, post_text)
+                    stderr_thread.join()
                     
-                    # Update output in main thread
-                    self.root.after(0, lambda: self.update_output(stdout, stderr, process.returncode))
+                    return_code = process.wait()
                     
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    self.root.after(0, lambda: self.update_output("", "Error: Code execution timed out (30 seconds)", -1))
                 except Exception as e:
-                    self.root.after(0, lambda: self.update_output("", f"Error: {str(e)}", -1))
+                    error = str(e)
                 finally:
                     if temp_file:
                         try:
                             os.unlink(temp_file.name)
                         except:
                             pass
+                    # Queued behind the output, so the summary is written last
+                    self.post_output('run_done', (return_code, error))
             
             # Start execution thread
             self.execution_thread = threading.Thread(target=run_in_thread)
@@ -1215,14 +1944,10 @@ class PyGUIde:
                 except:
                     pass
     
-    def update_output(self, stdout, stderr, return_code):
-        """Update the output area with execution results"""
-        self.output_text.insert("end", "\nOutput:\n")
-        if stdout:
-            self.output_text.insert("end", stdout)
-        
-        if stderr:
-            self.output_text.insert("end", f"\nErrors:\n{stderr}")
+    def show_run_result(self, return_code, error=None):
+        """Report how a run started by run_code ended"""
+        if error:
+            self.output_text.insert("end", f"\nError: {error}")
         
         if return_code == 0:
             self.output_text.insert("end", f"\n\nExecution completed successfully.")
@@ -1236,9 +1961,15 @@ class PyGUIde:
     
     def stop_execution(self):
         """Stop code execution"""
-        # This is a simplified implementation
+        process = self.running_process
+        if process is None or process.poll() is not None:
+            self.set_status("No code is running")
+            return
+        
+        # The run thread sees the pipes close and reports the exit code
+        process.kill()
         self.set_status("Execution stopped")
-        self.output_text.insert("end", "\n\n[Execution stopped by user]")
+        self.post_output('stdout', "\n\n[Execution stopped by user]")
     
     def check_syntax(self):
         """Check Python syntax"""
@@ -1246,7 +1977,7 @@ class PyGUIde:
         self.problems_text.delete("1.0", "end")
         
         try:
-            ast.parse(code)
+            self.code_analyzer.check_syntax(code, self.current_file or '<editor>')
             self.problems_text.insert("1.0", "✓ No syntax errors found!")
             self.set_status("Syntax check passed")
         except SyntaxError as e:
@@ -1261,12 +1992,26 @@ class PyGUIde:
             self.output_notebook.set("Problems")
     
     def analyze_current_code(self):
-        """Analyze the current code and update insights"""
+        """Analyze the current code in the background and update insights when done"""
         code = self.code_editor.get("1.0", "end-1c")
         if not code.strip():
             return
         
-        insights = self.code_analyzer.analyze_code(code)
+        self._analysis_pending_code = code
+        future = self._analysis_executor.submit(self.code_analyzer.analyze_code, code)
+        future.add_done_callback(lambda f: self.post_output('insights', (code, f)))
+    
+    def show_insights(self, code, future):
+        """Display a finished analysis unless the buffer has been resubmitted since"""
+        if code is not self._analysis_pending_code:
+            return
+        self._analysis_pending_code = None
+        
+        try:
+            insights = future.result()
+        except Exception as e:
+            self.set_status(f"Analysis failed: {str(e)}")
+            return
         
         # Clear and update insights
         self.insights_text.delete("1.0", "end")
@@ -1304,6 +2049,13 @@ class PyGUIde:
         complexity = min(insights['complexity_score'] / 20.0, 1.0)  # Normalize to 0-1
         self.complexity_progress.set(complexity)
     
+    def on_snippet_activate(self, event=None):
+        """Insert the snippet selected in the snippets list"""
+        selection = self.snippets_list.curselection()
+        if selection:
+            self.insert_snippet(self.snippets_list.get(selection[0]))
+            self.code_editor.focus_set()
+    
     def insert_snippet(self, snippet_name):
         """Insert a code snippet at cursor position"""
         snippet_code = self.snippet_manager.snippets.get(snippet_name, "")
@@ -1316,75 +2068,107 @@ class PyGUIde:
     
     def refresh_file_list(self):
         """Refresh the file explorer"""
-        # Clear existing items
-        for widget in self.file_list.winfo_children():
-            widget.destroy()
+        current_dir = self._cwd
+        self.current_dir_label.configure(text=f"Current: {os.path.basename(current_dir)}")
         
-        try:
-            current_dir = self.project_path if self.project_path else os.getcwd()
-            self.current_dir_label.configure(text=f"Current: {os.path.basename(current_dir)}")
-            
-            # Add parent directory option (only if not at project root)
-            if self.project_path and current_dir != self.project_path:
-                parent_btn = ctk.CTkButton(self.file_list, text=".. (Up)", 
-                                         command=lambda: self.change_directory(".."),
-                                         height=25, anchor="w")
-                parent_btn.pack(fill="x", pady=1)
-            
-            # List directories and Python files
-            items = []
+        # The directory is listed off the UI thread; monitor_output_queue fills in the result
+        def scan_thread():
             try:
-                for item in os.listdir(current_dir):
-                    if item.startswith('.'):  # Skip hidden files
-                        continue
-                        
-                    item_path = os.path.join(current_dir, item)
-                    if os.path.isdir(item_path):
-                        # Highlight venv directory
-                        if item in ['venv', 'env', '.venv', '.env']:
-                            items.append(("[VENV] " + item, item_path, "venv"))
-                        else:
-                            items.append(("[DIR] " + item, item_path, "dir"))
-                    elif item.endswith('.py'):
-                        items.append(("[PY] " + item, item_path, "file"))
-                    elif item.endswith(('.txt', '.md', '.json', '.xml', '.yml', '.yaml', '.cfg', '.ini')):
-                        items.append(("[FILE] " + item, item_path, "file"))
-                
-                # Sort items (directories first, then files)
-                items.sort(key=lambda x: (x[2] not in ["dir", "venv"], x[0].lower()))
-                
-                for display_name, full_path, item_type in items:
-                    if item_type in ["dir", "venv"]:
-                        btn = ctk.CTkButton(self.file_list, text=display_name,
-                                          command=lambda p=full_path: self.change_directory(p),
-                                          height=25, anchor="w")
-                        if item_type == "venv":
-                            btn.configure(fg_color="orange")
-                    else:
-                        btn = ctk.CTkButton(self.file_list, text=display_name,
-                                          command=lambda p=full_path: self.open_file_from_explorer(p),
-                                          height=25, anchor="w")
-                    btn.pack(fill="x", pady=1)
-                    
+                items = self.scan_directory(current_dir)
+                self.post_output('file_list', (current_dir, items, None))
             except PermissionError:
-                error_label = ctk.CTkLabel(self.file_list, text="Permission denied")
-                error_label.pack(pady=10)
+                self.post_output('file_list', (current_dir, None, "Permission denied"))
+            except Exception as e:
+                self.post_output('file_list', (current_dir, None, f"Error: {str(e)}"))
+        
+        threading.Thread(target=scan_thread, daemon=True).start()
+    
+    @staticmethod
+    def scan_directory(current_dir):
+        """List the directories and supported files shown in the file explorer"""
+        # List directories and Python files
+        items = []
+        for item in os.listdir(current_dir):
+            if item.startswith('.'):  # Skip hidden files
+                continue
                 
-        except Exception as e:
-            error_label = ctk.CTkLabel(self.file_list, text=f"Error: {str(e)}")
-            error_label.pack(pady=10)
+            item_path = os.path.join(current_dir, item)
+            if os.path.isdir(item_path):
+                # Highlight venv directory
+                if item in ['venv', 'env', '.venv', '.env']:
+                    items.append(("[VENV] " + item, item_path, "venv"))
+                else:
+                    items.append(("[DIR] " + item, item_path, "dir"))
+            elif item.endswith('.py'):
+                items.append(("[PY] " + item, item_path, "file"))
+            elif item.endswith(('.txt', '.md', '.json', '.xml', '.yml', '.yaml', '.cfg', '.ini')):
+                items.append(("[FILE] " + item, item_path, "file"))
+        
+        # Sort items (directories first, then files)
+        items.sort(key=lambda x: (x[2] not in ["dir", "venv"], x[0].lower()))
+        return items
+    
+    def populate_file_list(self, current_dir, items, error=None):
+        """Show a directory listing produced by refresh_file_list"""
+        # Ignore results of a scan that was superseded by a directory change
+        if current_dir != self._cwd:
+            return
+        
+        # Rows and the (type, path) each one activates, kept in step
+        rows = []
+        self._file_list_paths = []
+        
+        # Add parent directory option (only if not at project root)
+        if self._project_root_key and _dir_key(current_dir) != self._project_root_key:
+            rows.append(".. (Up)")
+            self._file_list_paths.append(("dir", ".."))
+        
+        if error:
+            rows.append(error)
+            self._file_list_paths.append((None, None))
+        else:
+            for display_name, full_path, item_type in items:
+                rows.append(display_name)
+                self._file_list_paths.append((item_type, full_path))
+        
+        self.file_list.delete(0, "end")
+        self.file_list.insert("end", *rows)
+        for index, (item_type, _) in enumerate(self._file_list_paths):
+            if item_type == "venv":
+                self.file_list.itemconfig(index, foreground="orange")
+    
+    def on_file_activate(self, event=None):
+        """Open the file or directory selected in the file list"""
+        selection = self.file_list.curselection()
+        if not selection:
+            return
+        item_type, path = self._file_list_paths[selection[0]]
+        if item_type in ["dir", "venv"]:
+            self.change_directory(path)
+        elif item_type is not None:
+            self.open_file_from_explorer(path)
+    
+    @property
+    def cwd(self):
+        """The current working directory, as last set through set_cwd"""
+        return self._cwd
+    
+    def set_cwd(self, path):
+        """Change the working directory and remember the result"""
+        os.chdir(path)
+        self._cwd = os.getcwd()
     
     def change_directory(self, path):
         """Change current directory"""
         try:
             if path == "..":
-                new_dir = os.path.dirname(os.getcwd())
+                new_dir = os.path.dirname(self._cwd)
                 # Don't go above project root if we have one
-                if self.project_path and not new_dir.startswith(self.project_path):
+                if self._project_root_key and not _dir_key(new_dir).startswith(self._project_root_key):
                     return
-                os.chdir(new_dir)
+                self.set_cwd(new_dir)
             else:
-                os.chdir(path)
+                self.set_cwd(path)
             self.refresh_file_list()
         except Exception as e:
             messagebox.showerror("Error", f"Could not change directory: {str(e)}")
@@ -1393,62 +2177,55 @@ class PyGUIde:
         """Open a file from the file explorer"""
         if self.check_unsaved_changes():
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
+                content = _read_text_file(file_path)
                 
-                self.code_editor.delete("1.0", "end")
-                self.code_editor.insert("1.0", content)
+                self.set_editor_text(content)
                 self.current_file = file_path
                 self.file_label.configure(text=os.path.basename(file_path))
-                self.highlight_syntax()
-                self.update_line_numbers()
-                self.set_status(f"Opened: {file_path}")
+                # Number and highlight once the new text is on screen rather than before
+                self.root.after_idle(self.update_line_numbers)
+                self.root.after_idle(self.highlight_syntax)
+                self.set_status(f"Opened: {file_path}", sticky=True)
                 
                 # Analyze dependencies
-                self.root.after(1000, self.refresh_dependencies)
+                self.schedule_dependency_refresh(1000)
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Could not open file: {str(e)}")
     
     def execute_console_command(self, event):
         """Execute command in interactive console"""
-        command = self.console_input.get().strip()
-        if not command:
+        command = self.console_input.get()
+        if not command.strip() and not (self.console_interpreter and self.console_interpreter.buffer):
             return
         
         # Add command to console output
         self.console_output.insert("end", command + "\n")
         
-        try:
-            # Simple evaluation - in a real implementation, you'd want a proper Python REPL
-            if command.startswith("print(") or "=" in command or command in ["help()", "exit()", "quit()"]:
-                # Handle special cases
-                if command in ["exit()", "quit()"]:
-                    self.console_output.insert("end", "Use Ctrl+C to exit console\n")
-                elif command == "help()":
-                    self.console_output.insert("end", "PyGUIde Interactive Console Help\n")
-                    self.console_output.insert("end", "Type Python expressions to evaluate them\n")
-                else:
-                    # Execute the command
-                    try:
-                        # Create a simple execution environment
-                        exec_globals = {"__name__": "__main__"}
-                        result = eval(command, exec_globals)
-                        if result is not None:
-                            self.console_output.insert("end", f"{result}\n")
-                    except:
-                        # Try exec for statements
-                        exec(command, exec_globals)
-            else:
-                # Try to evaluate as expression
-                result = eval(command)
-                if result is not None:
-                    self.console_output.insert("end", f"{result}\n")
-                    
-        except Exception as e:
-            self.console_output.insert("end", f"Error: {str(e)}\n")
-        
-        self.console_output.insert("end", ">>> ")
+        if self.console_interpreter is None:
+            import code
+            self.console_interpreter = code.InteractiveConsole({"__name__": "__main__"}, filename="<console>")
+        
+        more = False
+        if command.strip() in ["exit()", "quit()"]:
+            # Would raise SystemExit and close the IDE
+            self.console_output.insert("end", "Use Ctrl+C to exit console\n")
+        elif command.strip() == "help()":
+            # Interactive help reads from stdin, which would block the UI
+            self.console_output.insert("end", "PyGUIde Interactive Console Help\n")
+            self.console_output.insert("end", "Type Python expressions to evaluate them\n")
+        else:
+            # Results, prints and tracebacks all go to the console widget;
+            # push() keeps incomplete input (e.g. a "for" header) for the next line
+            try:
+                with contextlib.redirect_stdout(self._console_writer), contextlib.redirect_stderr(self._console_writer):
+                    more = self.console_interpreter.push(command)
+            except SystemExit:
+                # The interpreter re-raises SystemExit; keep the IDE running
+                self.console_interpreter.resetbuffer()
+                self.console_output.insert("end", "SystemExit ignored in the console\n")
+        
+        self.console_output.insert("end", "... " if more else ">>> ")
         self.console_output.see("end")
         self.console_input.delete(0, "end")
     
@@ -1460,49 +2237,72 @@ class PyGUIde:
         """Open replace dialog"""
         replace_dialog = ReplaceDialog(self.root, self.code_editor)
     
-    def undo(self):
+    def undo(self, event=None):
         """Undo last action"""
+        before = self.code_editor.get("1.0", "end-1c")
         try:
             self.code_editor.edit_undo()
-            self.highlight_syntax()
-            self.update_line_numbers()
         except tk.TclError:
-            pass
+            return "break"
+        self.refresh_changed_lines(before)
+        return "break"
     
-    def redo(self):
+    def redo(self, event=None):
         """Redo last undone action"""
+        before = self.code_editor.get("1.0", "end-1c")
         try:
             self.code_editor.edit_redo()
-            self.highlight_syntax()
-            self.update_line_numbers()
         except tk.TclError:
-            pass
+            return "break"
+        self.refresh_changed_lines(before)
+        return "break"
+    
+    def refresh_changed_lines(self, before):
+        """Rehighlight and renumber only the lines an edit changed, given the text before it"""
+        # Undo/redo may touch several places at once (e.g. a Replace All), so
+        # diff the buffer rather than trusting the insert mark
+        content = self.code_editor.get("1.0", "end-1c")
+        start, end = _changed_span(before, content)
+        start_line = content.count('\n', 0, start) + 1
+        end_line = start_line + content.count('\n', start, end)
+        self.highlight_range(f"{start_line}.0", f"{end_line}.0")
+        self.update_line_numbers()
     
     def toggle_theme(self):
         """Toggle between light and dark themes"""
-        current_mode = ctk.get_appearance_mode()
+        current_mode = ctk.get_appearance_mode().lower()
         new_mode = "light" if current_mode == "dark" else "dark"
         ctk.set_appearance_mode(new_mode)
         
         # Update code editor colors
         if new_mode == "dark":
             self.code_editor.configure(background='#1e1e1e', foreground='#ffffff')
-            self.line_numbers.configure(background='#2b2b2b', foreground='#666666')
+            self.line_numbers.configure(background='#2b2b2b')
+            self.snippets_list.configure(background='#2b2b2b', foreground='#ffffff')
+            self.file_list.configure(background='#2b2b2b', foreground='#ffffff')
         else:
             self.code_editor.configure(background='#ffffff', foreground='#000000')
-            self.line_numbers.configure(background='#f0f0f0', foreground='#666666')
+            self.line_numbers.configure(background='#f0f0f0')
+            self.snippets_list.configure(background='#f0f0f0', foreground='#000000')
+            self.file_list.configure(background='#f0f0f0', foreground='#000000')
         
-        self.highlight_syntax()
-        self.set_status(f"Switched to {new_mode} mode")
+        # Recolour the existing tags instead of re-tokenizing the buffer
+        self.apply_tag_palette(new_mode)
+        self.set_status(f"Switched to {new_mode} mode", sticky=True)
+    
+    def apply_tag_palette(self, mode):
+        """Set syntax tag colours for the given appearance mode"""
+        for tag, color in self._tag_palette[mode].items():
+            self.code_editor.tag_configure(tag, foreground=color)
     
     def toggle_sidebar(self):
         """Toggle sidebar visibility"""
         if self.sidebar.winfo_viewable():
             self.sidebar.grid_remove()
-            self.set_status("Sidebar hidden")
+            self.set_status("Sidebar hidden", sticky=True)
         else:
             self.sidebar.grid()
-            self.set_status("Sidebar shown")
+            self.set_status("Sidebar shown", sticky=True)
     
     def show_about(self):
         """Show about dialog"""
@@ -1536,38 +2336,90 @@ Perfect for learning Python and rapid prototyping!"""
         import webbrowser
         webbrowser.open("https://docs.python.org/3/")
     
-    def monitor_output_queue(self):
-        """Monitor the output queue for updates"""
+    def post_output(self, msg_type, content):
+        """Queue an output message from any thread; the queue wakes the UI to handle it"""
+        self.output_queue.put((msg_type, content))
+    
+    def notify_output_ready(self):
+        """Signal <<OutputReady>>, at most once until the queue has been drained"""
+        if self._output_event_pending:
+            return
+        self._output_event_pending = True
+        try:
+            self.root.event_generate("<<OutputReady>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            # Main loop not running (yet) or window already destroyed
+            self._output_event_pending = False
+    
+    def monitor_output_queue(self, event=None):
+        """Drain the output queue into the UI"""
+        self._output_event_pending = False
+        
+        # Coalesce queued output into a single insert per event
+        chunks = []
+        run_result = None
         try:
-            while True:
+            while len(chunks) < 64:
                 msg_type, content = self.output_queue.get_nowait()
                 if msg_type == 'stdout':
-                    self.output_text.insert("end", content)
-                    self.output_text.see("end")
+                    chunks.append(content)
+                elif msg_type == 'run_done':
+                    # Written after the output collected so far, so stop here
+                    run_result = content
+                    break
+                elif msg_type == 'file_list':
+                    self.populate_file_list(*content)
+                elif msg_type == 'insights':
+                    self.show_insights(*content)
+                elif msg_type == 'dependencies':
+                    self.show_dependencies(*content)
+                elif msg_type == 'project':
+                    # A project opened while the preload ran takes precedence
+                    if self.project_path is None:
+                        self.load_project(*content)
         except queue.Empty:
             pass
         
-        # Schedule next check
-        self.root.after(100, self.monitor_output_queue)
+        if chunks:
+            self.output_text.insert("end", "".join(chunks))
+            self.output_text.see("end")
+        if run_result is not None:
+            self.show_run_result(*run_result)
+        
+        # Let other events run before handling the rest of a large backlog
+        if not self.output_queue.empty():
+            self.notify_output_ready()
     
-    def set_status(self, message):
-        """Set status bar message"""
+    def set_status(self, message, sticky=False):
+        """Set status bar message; sticky messages stay until replaced"""
         self.status_label.configure(text=message)
-        # Clear status after 5 seconds
-        self.root.after(5000, lambda: self.status_label.configure(text="Ready"))
+        # Clear status after 5 seconds, restarting the timer of any earlier message
+        if self._status_after_id:
+            self.root.after_cancel(self._status_after_id)
+            self._status_after_id = None
+        if not sticky:
+            self._status_after_id = self.root.after(5000, self._clear_status)
+    
+    def _clear_status(self):
+        """Reset the status bar once a message has expired"""
+        self._status_after_id = None
+        self.status_label.configure(text="Ready")
     
     def load_settings(self):
         """Load user settings"""
         # Simplified settings loading
         try:
-            settings_file = Path.home() / ".pyguide_settings.json"
-            if settings_file.exists():
+            settings_file = os.path.join(os.path.expanduser("~"), ".pyguide_settings.json")
+            if os.path.exists(settings_file):
                 with open(settings_file, 'r') as f:
                     settings = json.load(f)
                     # Apply settings (theme, window size, etc.)
-                    if 'last_project' in settings and os.path.exists(settings['last_project']):
-                        # Optionally auto-open last project
-                        pass
+                    self.reopen_last_project.set(bool(settings.get('reopen_last_project', False)))
+                    self.parallel_installs.set(bool(settings.get('parallel_installs', False)))
+                    last_project = settings.get('last_project')
+                    if self.reopen_last_project.get() and last_project and os.path.isdir(last_project):
+                        # Scan in the background so the window is not held up by a large tree
+                        threading.Thread(target=self.preload_project, args=(last_project,), daemon=True).start()
         except Exception:
             pass  # Use defaults if settings can't be loaded
     
@@ -1577,12 +2429,26 @@ Perfect for learning Python and rapid prototyping!"""
             settings = {
                 'theme': ctk.get_appearance_mode(),
                 'window_geometry': self.root.geometry(),
-                'last_directory': os.getcwd(),
-                'last_project': self.project_path
+                'last_directory': self._cwd,
+                'last_project': self.project_path,
+                'reopen_last_project': self.reopen_last_project.get(),
+                'parallel_installs': self.parallel_installs.get()
             }
-            settings_file = Path.home() / ".pyguide_settings.json"
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
+            settings_file = os.path.join(os.path.expanduser("~"), ".pyguide_settings.json")
+            payload = _SETTINGS_ENCODER(settings).encode('utf-8')
+            
+            # Write a temporary file and rename it over the old one, so a crash
+            # mid-write never leaves a truncated settings file behind
+            tmp_file = settings_file + ".tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_file, settings_file)
         except Exception:
             pass  # Silently fail if settings can't be saved
     
@@ -1590,6 +2456,8 @@ Perfect for learning Python and rapid prototyping!"""
         """Handle application closing"""
         if self.check_unsaved_changes():
             self.save_settings()
+            self._analysis_executor.shutdown(wait=False)
+            self._deps_executor.shutdown(wait=False)
             self.root.destroy()
     
     def run(self):
@@ -1624,14 +2492,41 @@ class FindDialog:
         
         self.find_entry.bind('<Return>', lambda e: self.find_next())
         self.dialog.bind('<Escape>', lambda e: self.dialog.destroy())
+        
+        # Text searched and its line offsets, read on the first search; the dialog
+        # holds the grab, so the editor cannot change while it is open
+        self._text = None
+        self._line_starts = None
+        self._astral = False
+    
+    def to_index(self, offset):
+        """Convert an offset into the snapshot to a Tk "line.col" index"""
+        line = bisect.bisect_right(self._line_starts, offset) - 1
+        if self._astral:
+            return f"{line + 1}.{_tk_column(self._text, self._line_starts[line], offset)}"
+        return f"{line + 1}.{offset - self._line_starts[line]}"
+    
+    def from_index(self, index):
+        """Convert a Tk "line.col" index to an offset into the snapshot"""
+        line, col = map(int, self.text_widget.index(index).split('.'))
+        line_start = self._line_starts[line - 1]
+        if self._astral:
+            return _str_column(self._text, line_start, col)
+        return line_start + col
     
     def find_next(self):
         """Find next occurrence"""
         search_text = self.find_entry.get()
         if search_text:
-            start_pos = self.text_widget.search(search_text, tk.INSERT, "end")
-            if start_pos:
-                end_pos = f"{start_pos}+{len(search_text)}c"
+            if self._text is None:
+                self._text = self.text_widget.get("1.0", "end-1c")
+                self._line_starts = _line_starts(self._text)
+                self._astral = _has_astral(self._text)
+            
+            offset = self._text.find(search_text, self.from_index(tk.INSERT))
+            if offset != -1:
+                start_pos = self.to_index(offset)
+                end_pos = self.to_index(offset + len(search_text))
                 self.text_widget.tag_remove("sel", "1.0", "end")
                 self.text_widget.tag_add("sel", start_pos, end_pos)
                 self.text_widget.mark_set(tk.INSERT, end_pos)
@@ -1679,8 +2574,17 @@ class ReplaceDialog:
         replace_text = self.replace_entry.get()
         
         if find_text and self.text_widget.tag_ranges("sel"):
-            self.text_widget.delete("sel.first", "sel.last")
-            self.text_widget.insert(tk.INSERT, replace_text)
+            # One replace call keeps the edit a single undo step
+            self.text_widget.edit_separator()
+            try:
+                self.text_widget.replace("sel.first", "sel.last", replace_text)
+            except tk.TclError:
+                # Tk before 8.6 has no replace; marks follow the text between the two calls
+                self.text_widget.mark_set("replace_start", "sel.first")
+                self.text_widget.delete("replace_start", "sel.last")
+                self.text_widget.insert("replace_start", replace_text)
+                self.text_widget.mark_unset("replace_start")
+            self.text_widget.edit_separator()
     
     def replace_all(self):
         """Replace all occurrences"""
@@ -1688,13 +2592,29 @@ class ReplaceDialog:
         replace_text = self.replace_entry.get()
         
         if find_text:
-            content = self.text_widget.get("1.0", "end-1c")
-            new_content = content.replace(find_text, replace_text)
+            # Replace in place, hit by hit, as one undoable step
+            autoseparators = self.text_widget.cget("autoseparators")
+            self.text_widget.configure(autoseparators=False)
+            self.text_widget.edit_separator()
             
-            self.text_widget.delete("1.0", "end")
-            self.text_widget.insert("1.0", new_content)
+            # Find every match with one "search -all" (tkinter's search() has no
+            # -all option), then replace from the last so earlier indices stay valid
+            match_lengths = tk.StringVar(self.text_widget)
+            positions = self.text_widget.tk.splitlist(self.text_widget.tk.call(
+                str(self.text_widget), "search", "-all", "-count", match_lengths,
+                "--", find_text, "1.0", "end"))
+            lengths = self.text_widget.tk.splitlist(match_lengths.get()) if positions else ()
+            
+            count = 0
+            try:
+                for pos, length in zip(reversed(positions), reversed(lengths)):
+                    self.text_widget.delete(pos, f"{pos}+{length}c")
+                    self.text_widget.insert(pos, replace_text)
+                    count += 1
+            finally:
+                self.text_widget.edit_separator()
+                self.text_widget.configure(autoseparators=autoseparators)
             
-            count = content.count(find_text)
             messagebox.showinfo("Replace All", f"Replaced {count} occurrences")
 
 